@@ -22,11 +22,19 @@ def main():
     FIELD_ID_COUNTRY = st.secrets["field_ids"]["country"]
     FIELD_ID_USER_PROFILE = st.secrets["field_ids"]["user_profile"]
     
+    # Debug output is off unless enabled in secrets - it is written for every
+    # loaded entry, so it grows with the size of the list
+    DEBUG = st.secrets.get("debug", False)
+
+    # Cap on how many entries are loaded, since each one costs two API calls
+    MAX_ENTRIES = st.secrets["affinity"].get("max_entries", 100)
+
     # DEBUG: Print field IDs from secrets
-    st.write("### DEBUG: FIELD IDs FROM SECRETS")
-    st.write(f"FIELD_ID_INVESTORS = {FIELD_ID_INVESTORS}")
-    st.write(f"FIELD_ID_COUNTRY = {FIELD_ID_COUNTRY}")
-    st.write(f"FIELD_ID_SUMMARY = {FIELD_ID_SUMMARY}")
+    if DEBUG:
+        st.write("### DEBUG: FIELD IDs FROM SECRETS")
+        st.write(f"FIELD_ID_INVESTORS = {FIELD_ID_INVESTORS}")
+        st.write(f"FIELD_ID_COUNTRY = {FIELD_ID_COUNTRY}")
+        st.write(f"FIELD_ID_SUMMARY = {FIELD_ID_SUMMARY}")
 
     # Get name to person ID mapping from secrets
     NAME_TO_PERSON_ID = st.secrets["mappings"]["name_to_person_id"]
@@ -50,51 +58,71 @@ def main():
         # Return name if found, otherwise return the ID
         return PERSON_ID_TO_NAME.get(person_id_str, person_id_str)
 
-    # Function to fetch list entries with caching
+    # Function to fetch one page of list entries with caching. Raises on an
+    # error response so that st.cache_data never stores a failed page
     @st.cache_data(ttl=3600)
-    def fetch_list_entries_cached():
+    def fetch_list_entries_page_cached(page_token=None):
         url = f"{BASE_URL}/lists/{LIST_ID}/list-entries"
-        params = {'page_size': 5}  # Limit to 5 entries
+        params = {'page_size': 500}  # Largest page size the API allows
+        if page_token:
+            params['page_token'] = page_token
         
         response = requests.get(url, headers=headers, params=params)
-        if response.status_code != 200:
-            return []
+        response.raise_for_status()
+        return response.json()
+
+    # Function to fetch every list entry, following next_page_token. If a page
+    # fails, the entries from the pages already fetched are kept
+    def fetch_list_entries():
+        entries = []
+        page_token = None
         
-        if isinstance(response.json(), dict) and 'list_entries' in response.json():
-            data = response.json()
-            return data.get('list_entries', [])
-        else:
-            return response.json()
+        while True:
+            try:
+                data = fetch_list_entries_page_cached(page_token)
+            except requests.RequestException as e:
+                st.warning(f"Could not fetch every list entry ({e}) - showing the {len(entries)} fetched so far")
+                return entries
+            
+            if not (isinstance(data, dict) and 'list_entries' in data):
+                return data
+            
+            entries.extend(data.get('list_entries', []))
+            page_token = data.get('next_page_token')
+            if not page_token:
+                return entries
 
     # Function to fetch field values using entity_id with caching
     @st.cache_data(ttl=3600)
     def fetch_field_values_cached(entity_id):
         field_values_url = f"{BASE_URL}/field-values?organization_id={entity_id}"
         response = requests.get(field_values_url, headers=headers)
-        st.write(f"### DEBUG: API RESPONSE STATUS CODE: {response.status_code}")
+        if DEBUG:
+            st.write(f"### DEBUG: API RESPONSE STATUS CODE: {response.status_code}")
         if response.status_code != 200:
             st.error(f"Failed to fetch field values: {response.text}")
             return []
         
-        # Debug the raw response
         response_data = response.json()
-        st.write(f"### DEBUG: API RESPONSE DATA TYPE: {type(response_data)}")
-        st.write(f"### DEBUG: API RESPONSE DATA LENGTH: {len(response_data) if isinstance(response_data, list) else 'Not a list'}")
-        
-        # Look for our specific fields of interest
-        st.write("### DEBUG: SEARCHING FOR FIELDS OF INTEREST")
-        for item in response_data:
-            if isinstance(item, dict) and "field_id" in item:
-                field_id = item.get("field_id")
-                if field_id in [FIELD_ID_INVESTORS, FIELD_ID_COUNTRY, FIELD_ID_SUMMARY]:
-                    which_field = "Unknown"
-                    if field_id == FIELD_ID_INVESTORS:
-                        which_field = "Investors"
-                    elif field_id == FIELD_ID_COUNTRY:
-                        which_field = "Country"
-                    elif field_id == FIELD_ID_SUMMARY:
-                        which_field = "Summary"
-                    st.write(f"Found {which_field} (field_id {field_id}): {item}")
+        
+        # Debug the raw response and look for our specific fields of interest
+        if DEBUG:
+            st.write(f"### DEBUG: API RESPONSE DATA TYPE: {type(response_data)}")
+            st.write(f"### DEBUG: API RESPONSE DATA LENGTH: {len(response_data) if isinstance(response_data, list) else 'Not a list'}")
+            
+            st.write("### DEBUG: SEARCHING FOR FIELDS OF INTEREST")
+            for item in response_data:
+                if isinstance(item, dict) and "field_id" in item:
+                    field_id = item.get("field_id")
+                    if field_id in [FIELD_ID_INVESTORS, FIELD_ID_COUNTRY, FIELD_ID_SUMMARY]:
+                        which_field = "Unknown"
+                        if field_id == FIELD_ID_INVESTORS:
+                            which_field = "Investors"
+                        elif field_id == FIELD_ID_COUNTRY:
+                            which_field = "Country"
+                        elif field_id == FIELD_ID_SUMMARY:
+                            which_field = "Summary"
+                        st.write(f"Found {which_field} (field_id {field_id}): {item}")
         
         return response_data
 
@@ -152,20 +180,21 @@ def main():
         result = {}
         
         # Debug: Print raw field values data and field map
-        st.write("### DEBUG: RAW FIELD VALUES DATA")
-        st.write(field_values_data)
-        st.write("### DEBUG: FIELD MAP")
-        st.write(field_map)
-        st.write("### DEBUG: FIELD IDs REVERSE MAPPING")
-        st.write({v: k for k, v in field_map.items()})
-        
-        # Create a log of field IDs found in the data
-        found_field_ids = set()
-        for field_value in field_values_data:
-            found_field_ids.add(field_value.get("field_id"))
-        
-        st.write("### DEBUG: FOUND FIELD IDs")
-        st.write(found_field_ids)
+        if DEBUG:
+            st.write("### DEBUG: RAW FIELD VALUES DATA")
+            st.write(field_values_data)
+            st.write("### DEBUG: FIELD MAP")
+            st.write(field_map)
+            st.write("### DEBUG: FIELD IDs REVERSE MAPPING")
+            st.write({v: k for k, v in field_map.items()})
+            
+            # Create a log of field IDs found in the data
+            found_field_ids = set()
+            for field_value in field_values_data:
+                found_field_ids.add(field_value.get("field_id"))
+            
+            st.write("### DEBUG: FOUND FIELD IDs")
+            st.write(found_field_ids)
         
         for field_value in field_values_data:
             field_id = field_value.get("field_id")
@@ -173,28 +202,34 @@ def main():
                 display_name = field_map[field_id]
                 
                 # Debug: Show field matching process
-                st.write(f"### DEBUG: MATCHING FIELD ID {field_id} = {display_name}")
-                st.write(field_value)
+                if DEBUG:
+                    st.write(f"### DEBUG: MATCHING FIELD ID {field_id} = {display_name}")
+                    st.write(field_value)
                 
                 # Extract the appropriate value based on value type
                 if "text_value" in field_value and field_value.get("text_value") is not None:
                     result[display_name] = field_value.get("text_value")
-                    st.write(f"   Using text_value: {field_value.get('text_value')}")
+                    if DEBUG:
+                        st.write(f"   Using text_value: {field_value.get('text_value')}")
                 elif "number_value" in field_value and field_value.get("number_value") is not None:
                     result[display_name] = field_value.get("number_value")
-                    st.write(f"   Using number_value: {field_value.get('number_value')}")
+                    if DEBUG:
+                        st.write(f"   Using number_value: {field_value.get('number_value')}")
                 elif "date_value" in field_value and field_value.get("date_value") is not None:
                     result[display_name] = field_value.get("date_value")
-                    st.write(f"   Using date_value: {field_value.get('date_value')}")
+                    if DEBUG:
+                        st.write(f"   Using date_value: {field_value.get('date_value')}")
                 elif "value" in field_value:
                     # Handle complex value types (like objects or dropdown options)
                     result[display_name] = field_value.get("value")
-                    st.write(f"   Using value: {field_value.get('value')}")
-                else:
+                    if DEBUG:
+                        st.write(f"   Using value: {field_value.get('value')}")
+                elif DEBUG:
                     st.write(f"   WARNING: No recognized value field found for {display_name}")
         
-        st.write("### DEBUG: FINAL EXTRACTED VALUES")
-        st.write(result)
+        if DEBUG:
+            st.write("### DEBUG: FINAL EXTRACTED VALUES")
+            st.write(result)
         
         return result
 
@@ -220,6 +255,37 @@ def main():
         except:
             return str(value)
 
+    # Function to track an entry to a user: sets Transition Owner and Reviewed,
+    # adds the entity to the Master Dealflow list and sets its owner field there
+    def track_entry(entry_id, entity_id, user):
+        # Update Transition Owner field
+        success1 = update_field_value(entry_id, FIELD_ID_TRANSITION_OWNER, NAME_TO_PERSON_ID.get(user), entity_id)
+
+        # Update Reviewed field
+        success2 = update_field_value(entry_id, FIELD_ID_REVIEWED, NAME_TO_PERSON_ID.get(user), entity_id)
+
+        # Create a list entry in the Master Dealflow list for this entity
+        master_list_url = f"{BASE_URL}/lists/{MASTER_DEALFLOW_LIST_ID}/list-entries"
+        master_list_data = {"entity_id": entity_id}
+        master_list_response = requests.post(master_list_url, headers=headers, json=master_list_data)
+        success3 = master_list_response.status_code == 200 or master_list_response.status_code == 201
+
+        # If the entity was successfully added to the Master Dealflow list, update the field ID 2017295
+        success4 = True
+        if success3:
+            try:
+                # Get the list entry ID from the response
+                master_list_entry_data = master_list_response.json()
+                master_list_entry_id = master_list_entry_data.get("id")
+                
+                # Use the same update_field_value function we use elsewhere
+                success4 = update_field_value(master_list_entry_id, FIELD_ID_MASTER_DEALFLOW, NAME_TO_PERSON_ID.get(user), entity_id)
+            except Exception as e:
+                success4 = False
+                print(f"Error updating Master Dealflow field: {e}")
+        
+        return success1, success2, success3, success4
+
     # Set up authentication
     auth = base64.b64encode(f":{API_KEY}".encode()).decode()
     headers = {
@@ -229,8 +295,8 @@ def main():
 
     st.title("CRM Deals")
     
-    # Create tabs for main view and summary
-    tab1, tab2 = st.tabs(["Deals Queue", "Status Summary"])
+    # Create tabs for main view, summary and the all deals table
+    tab1, tab2, tab3 = st.tabs(["Deals Queue", "Status Summary", "All Deals"])
     
     # Initialize session state
     if 'all_entries' not in st.session_state:
@@ -241,6 +307,23 @@ def main():
     if 'show_track_dropdown' not in st.session_state:
         st.session_state.show_track_dropdown = False
     
+    # Reset the queue and table position when a filter changes. Bumping the
+    # table version also clears any rows selected under the old filters
+    def reset_position():
+        st.session_state.current_index = 0
+        st.session_state.deals_table_page = 1
+        st.session_state.deals_table_version += 1
+    
+    # Initialize the all deals table state
+    if 'deals_table_page' not in st.session_state:
+        st.session_state.deals_table_page = 1
+    
+    if 'deals_table_version' not in st.session_state:
+        st.session_state.deals_table_version = 0
+    
+    if 'deals_table_message' not in st.session_state:
+        st.session_state.deals_table_message = None
+    
     # Add filters in a 2x2 grid within the first tab
     with tab1:
         col1, col2 = st.columns(2)
@@ -249,14 +332,14 @@ def main():
     with col1:
         selected_profile = st.selectbox("Filter by User Profile", ["All"] + USER_PROFILES, index=0,
                                       key="profile_filter", 
-                                      on_change=lambda: setattr(st.session_state, 'current_index', 0))
+                                      on_change=reset_position)
     
     # Filter for Deal category - Updated to use field ID from secrets with new options
     with col2:
         categories = st.secrets["filter_options"]["categories"]
         selected_category = st.selectbox("Filter by Category", categories, index=0,
                                         key="category_filter", 
-                                        on_change=lambda: setattr(st.session_state, 'current_index', 0))
+                                        on_change=reset_position)
     
     # Second row of filters
     col3, col4 = st.columns(2)
@@ -266,14 +349,14 @@ def main():
         review_statuses = ["All", "Not Reviewed"]
         selected_review_status = st.selectbox("Review Status", review_statuses, index=0,
                                              key="review_filter",
-                                             on_change=lambda: setattr(st.session_state, 'current_index', 0))
+                                             on_change=reset_position)
     
     # Date filter - Changed to have "All time" as default
     with col4:
         date_ranges = ["All time", "Last 14 days", "Last 30 days", "Last 90 days"]
         selected_date_range = st.selectbox("Date Range", date_ranges, index=0,
                                           key="date_filter",
-                                          on_change=lambda: setattr(st.session_state, 'current_index', 0))
+                                          on_change=reset_position)
     
     # Initialize loading status
     if 'loading_complete' not in st.session_state:
@@ -282,7 +365,12 @@ def main():
     # Start loading entries if needed
     if len(st.session_state.all_entries) == 0:
         # Get entries
-        entries = fetch_list_entries_cached()
+        entries = fetch_list_entries()
+        st.session_state.total_entries = len(entries)
+        
+        # Only load the most recent entries when the list is larger than the cap
+        if len(entries) > MAX_ENTRIES:
+            entries = sorted(entries, key=lambda entry: entry.get("created_at") or "", reverse=True)[:MAX_ENTRIES]
         
         # Initialize with at least one processed entry for immediate display
         if entries:
@@ -330,6 +418,8 @@ def main():
     
     # Display status of loaded entries
     loading_message = "Loading entries in background..." if not st.session_state.loading_complete else f"Loaded {len(st.session_state.all_entries)} entries"
+    if st.session_state.loading_complete and st.session_state.get("total_entries", 0) > len(st.session_state.all_entries):
+        loading_message = f"Loaded the {len(st.session_state.all_entries)} most recent of {st.session_state.total_entries} entries"
     st.caption(loading_message)
     
     # Apply filters to the stored entries
@@ -498,6 +588,143 @@ def main():
         else:
             st.info("Loading data... Please wait for the summary table to populate.")
     
+    # All deals table in the third tab - sorted and paginated on the server so
+    # only the current page of rows is sent to the browser
+    with tab3:
+        st.subheader("All Deals")
+        st.caption("Shows the entries matching the Deals Queue filters.")
+        
+        # Sort keys work on the raw entry values, not the formatted display strings
+        sort_columns = {
+            "Date": lambda entry: entry.get("created_at"),
+            "Company": lambda entry: entry.get("entity", {}).get("name"),
+            "Category": lambda entry: entry.get("formatted_values", {}).get("Deal category"),
+            "User profile": lambda entry: entry.get("formatted_values", {}).get("User profile"),
+            "Country": lambda entry: entry.get("formatted_values", {}).get("Country"),
+            "Reviewed": lambda entry: person_id_to_name(entry.get("formatted_values", {}).get("Reviewed")),
+            "Tracking": lambda entry: entry.get("tracking_status"),
+        }
+        
+        reset_page = lambda: setattr(st.session_state, 'deals_table_page', 1)
+        
+        table_col1, table_col2, table_col3 = st.columns(3)
+        with table_col1:
+            sort_column = st.selectbox("Sort by", list(sort_columns), index=0,
+                                       key="deals_table_sort", on_change=reset_page)
+        with table_col2:
+            sort_order = st.selectbox("Order", ["Descending", "Ascending"], index=0,
+                                      key="deals_table_order", on_change=reset_page)
+        with table_col3:
+            page_size = st.selectbox("Rows per page", [25, 50, 100], index=0,
+                                     key="deals_table_page_size", on_change=reset_page)
+        
+        # Sort all filtered entries, keeping missing values last in either order
+        sort_key = sort_columns[sort_column]
+        present_entries = [entry for entry in filtered_entries if sort_key(entry) not in (None, "", "-")]
+        missing_entries = [entry for entry in filtered_entries if sort_key(entry) in (None, "", "-")]
+        sorted_entries = sorted(present_entries, key=lambda entry: str(sort_key(entry)).lower(),
+                                reverse=sort_order == "Descending") + missing_entries
+        
+        # Keep the page in bounds when the filters shrink the list
+        total_pages = max(1, (len(sorted_entries) + page_size - 1) // page_size)
+        if st.session_state.deals_table_page > total_pages:
+            st.session_state.deals_table_page = total_pages
+        
+        page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages,
+                               step=1, key="deals_table_page")
+        page_start = (page - 1) * page_size
+        page_entries = sorted_entries[page_start:page_start + page_size]
+        
+        # Build display rows for the current page only
+        table_rows = []
+        for entry in page_entries:
+            formatted_values = entry.get("formatted_values", {})
+            entity = entry.get("entity", {})
+            reviewed_value = formatted_values.get("Reviewed")
+            table_rows.append({
+                "Company": entity.get("name", "Unknown"),
+                "Domain": entity.get("domain") or "-",
+                "Date": format_date(entry.get("created_at")),
+                "Category": formatted_values.get("Deal category", "-"),
+                "User profile": formatted_values.get("User profile", "-"),
+                "Country": formatted_values.get("Country", "-"),
+                "Investors": formatted_values.get("Investors", "-"),
+                "Reviewed": person_id_to_name(reviewed_value) if reviewed_value is not None else "-",
+                "Tracking": entry.get("tracking_status", "No"),
+            })
+        
+        # Show the result of the last bulk action, which is lost on rerun otherwise
+        if st.session_state.deals_table_message:
+            message_type, message_text = st.session_state.deals_table_message
+            getattr(st, message_type)(message_text)
+            st.session_state.deals_table_message = None
+        
+        if table_rows:
+            st.write(f"Showing {page_start + 1}-{page_start + len(page_entries)} of {len(sorted_entries)} matching entries")
+            
+            # The key changes with the page so the row selection never points at another page
+            table_event = st.dataframe(
+                pd.DataFrame(table_rows),
+                width="stretch",
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="multi-row",
+                key=f"deals_table_{page}_{sort_column}_{sort_order}_{page_size}_{st.session_state.deals_table_version}",
+            )
+            selected_entries = [page_entries[row] for row in table_event.selection.rows if row < len(page_entries)]
+            
+            # Bulk actions on the selected rows
+            bulk_col1, bulk_col2, bulk_col3 = st.columns(3)
+            with bulk_col1:
+                bulk_user = st.selectbox("Track to", ASSIGNABLE_USERS, key="deals_table_track_user",
+                                         label_visibility="collapsed")
+            with bulk_col2:
+                bulk_track = st.button(f"✅ Track selected ({len(selected_entries)})", key="deals_table_track",
+                                       disabled=not selected_entries, width="stretch")
+            with bulk_col3:
+                bulk_pass = st.button(f"🗑️ Pass selected ({len(selected_entries)})", key="deals_table_pass",
+                                      disabled=not selected_entries, width="stretch")
+            
+            if bulk_track or bulk_pass:
+                failed = []
+                field_warnings = 0
+                with st.spinner(f"Updating {len(selected_entries)} entries..."):
+                    for entry in selected_entries:
+                        entry_id = entry.get("id")
+                        entity_id = entry.get("entity_id")
+                        if bulk_track:
+                            success1, success2, success3, success4 = track_entry(entry_id, entity_id, bulk_user)
+                            success = success1 and success2 and success3
+                            if success and not success4:
+                                field_warnings += 1
+                            reviewed_name = bulk_user
+                        else:
+                            success = update_field_value(entry_id, FIELD_ID_REVIEWED, NAME_TO_PERSON_ID.get("Pass"), entity_id)
+                            reviewed_name = "Pass"
+                        
+                        if success:
+                            # Update the stored entry so the table and filters reflect the change
+                            entry.setdefault("formatted_values", {})["Reviewed"] = NAME_TO_PERSON_ID.get(reviewed_name)
+                            if bulk_track:
+                                entry["tracking_status"] = "Yes"
+                        else:
+                            failed.append(entry.get("entity", {}).get("name", "Unknown"))
+                
+                action_name = f"Tracked to {bulk_user}" if bulk_track else "Marked as Pass"
+                succeeded = len(selected_entries) - len(failed)
+                if failed:
+                    st.session_state.deals_table_message = ("error", f"{action_name}: {succeeded} succeeded, failed for {', '.join(failed)}")
+                elif field_warnings:
+                    st.session_state.deals_table_message = ("warning", f"{action_name}: {succeeded} entries, but failed to update Master Dealflow field for {field_warnings}")
+                else:
+                    st.session_state.deals_table_message = ("success", f"{action_name}: {succeeded} entries")
+                
+                # Clear the selection and refresh the table
+                st.session_state.deals_table_version += 1
+                st.rerun()
+        else:
+            st.write("No entries match the current filters")
+    
     # Display current entry if any matches the filter
     if filtered_entries:
         # Get current entry
@@ -614,31 +841,7 @@ def main():
                 with st.container():
                     for user in all_users:
                         if st.button(user, key=f"assign_{user}"):
-                            # Update Transition Owner field
-                            success1 = update_field_value(entry_id, FIELD_ID_TRANSITION_OWNER, NAME_TO_PERSON_ID.get(user), entity_id)
-                            
-                            # Update Reviewed field
-                            success2 = update_field_value(entry_id, FIELD_ID_REVIEWED, NAME_TO_PERSON_ID.get(user), entity_id)
-                            
-                            # Create a list entry in the Master Dealflow list for this entity
-                            master_list_url = f"{BASE_URL}/lists/{MASTER_DEALFLOW_LIST_ID}/list-entries"
-                            master_list_data = {"entity_id": entity_id}
-                            master_list_response = requests.post(master_list_url, headers=headers, json=master_list_data)
-                            success3 = master_list_response.status_code == 200 or master_list_response.status_code == 201
-                            
-                            # If the entity was successfully added to the Master Dealflow list, update the field ID 2017295
-                            success4 = True
-                            if success3:
-                                try:
-                                    # Get the list entry ID from the response
-                                    master_list_entry_data = master_list_response.json()
-                                    master_list_entry_id = master_list_entry_data.get("id")
-                                    
-                                    # Use the same update_field_value function we use elsewhere
-                                    success4 = update_field_value(master_list_entry_id, FIELD_ID_MASTER_DEALFLOW, NAME_TO_PERSON_ID.get(user), entity_id)
-                                except Exception as e:
-                                    success4 = False
-                                    print(f"Error updating Master Dealflow field: {e}")
+                            success1, success2, success3, success4 = track_entry(entry_id, entity_id, user)
                             
                             # Hide the dropdown after selection
                             st.session_state.show_track_dropdown = False
@@ -0,0 +1,348 @@
+"""Multi-session load test for app.py against the local mock Affinity server.
+
+Starts mock_affinity.py in-process, then runs N simulated sessions of
+app.py at the same time with Streamlit's AppTest. Each session clicks a
+random mix of Next, Pass and Track. The harness reports rerun latency
+percentiles, API calls per action, injected API failures, actions that
+showed an error, and memory growth.
+
+Each session runs in its own process, because AppTest is not safe to run
+concurrently in one process: every run swaps the global st.secrets and
+clears the global Runtime instance. So the numbers describe N isolated
+single-user apps that share only the mock API. There is no shared
+st.cache_data and no contention inside a server process, and Load API
+calls are cold-cache counts. They are not a measure of several reviewers
+on one Streamlit server.
+
+app.py enriches at most max_entries of the most recent list entries (two
+API calls each) on the first run. --entries sets the list size on the
+mock and --max-entries sets the cap.
+
+Example:
+    python load_test.py --sessions 8 --actions 20 --latency-ms 150 --rate-limit-rate 0.05
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+import requests
+
+import mock_affinity
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+ACTIONS = ["Next", "Pass", "Track"]
+
+# Uses the same element types as app.py, so their imports happen before
+# the memory baseline is taken
+WARMUP_SCRIPT = """
+import pandas as pd
+import requests
+import streamlit as st
+
+tab1, tab2 = st.tabs(["a", "b"])
+col1, col2 = st.columns(2)
+st.selectbox("s", ["x"])
+st.number_input("n", min_value=1, max_value=2)
+st.button("b", width="stretch")
+st.dataframe(pd.DataFrame({"a": [1]}), on_select="rerun", selection_mode="multi-row")
+st.markdown("m")
+st.caption("c")
+st.error("e")
+"""
+
+
+# Build the secrets app.py expects, pointing at the mock server
+def build_secrets(base_url, max_entries=100):
+    return {
+        "affinity": {
+            "api_key": "mock-key",
+            "base_url": base_url,
+            "list_id": mock_affinity.LIST_ID,
+            "master_list_id": mock_affinity.MASTER_DEALFLOW_LIST_ID,
+            "max_entries": max_entries,
+        },
+        "field_ids": dict(mock_affinity.FIELD_IDS),
+        "mappings": {"name_to_person_id": dict(mock_affinity.NAME_TO_PERSON_ID)},
+        "profiles": {
+            "filter_options": list(mock_affinity.USER_PROFILES),
+            "summary_display": list(mock_affinity.USER_PROFILES) + ["Other"],
+            "assignable_users": [name for name in mock_affinity.NAME_TO_PERSON_ID if name != "Pass"],
+        },
+        "filter_options": {"categories": list(mock_affinity.CATEGORIES)},
+    }
+
+
+# Find a button by key or label in the current AppTest element tree
+def find_button(at, key=None, label=None):
+    for button in at.button:
+        if key is not None and button.key == key:
+            return button
+        if label is not None and button.label == label:
+            return button
+    return None
+
+
+# Peak resident memory of this process in MB
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    if os.uname().sysname == "Darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def session_api_calls(stats_url, session):
+    response = requests.get(stats_url, params={"session": session}, timeout=10)
+    return response.json()["total"]
+
+
+# Run one simulated session and return its raw measurements
+def run_session(session_index, server_url, num_actions, max_entries, timeout, seed, barrier):
+    from streamlit.testing.v1 import AppTest
+
+    # app.py logs a use_container_width deprecation warning on every rerun.
+    # Streamlit resets its logger levels whenever AppTest re-parses the config,
+    # so drop these records with a filter on the emitting logger instead
+    logging.getLogger("streamlit.deprecation_util").addFilter(lambda record: False)
+
+    session = f"s{session_index}"
+    stats_url = f"{server_url}/_stats"
+    rng = random.Random(seed + session_index)
+    users = [name for name in mock_affinity.NAME_TO_PERSON_ID if name != "Pass"]
+
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        at.secrets = build_secrets(f"{server_url}/{session}", max_entries)
+    except Exception:
+        # Release the other sessions instead of leaving them at the barrier
+        barrier.abort()
+        raise
+
+    reruns = []  # (action, seconds)
+    calls = []  # (action, api calls)
+    skipped = Counter()
+    failed = Counter()  # actions where a rerun showed st.error
+    exceptions = 0
+
+    # Streamlit imports most of its element code and pandas lazily on the first
+    # run, so warm up with a throwaway script before taking the RSS baseline
+    AppTest.from_string(WARMUP_SCRIPT, default_timeout=timeout).run()
+    baseline_rss = peak_rss_mb()
+
+    # Run the script once and return whether it showed an error. The app
+    # reports failed API calls with st.error rather than raising
+    def timed_run(action):
+        nonlocal exceptions
+        start = time.perf_counter()
+        at.run()
+        reruns.append((action, time.perf_counter() - start))
+        if at.exception:
+            exceptions += 1
+        return bool(at.error)
+
+    # Start all sessions together once they have finished importing
+    try:
+        barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        raise RuntimeError(f"{session}: another session failed or timed out before the start") from None
+
+    # Initial page load
+    before = session_api_calls(stats_url, session)
+    if timed_run("Load"):
+        failed["Load"] += 1
+    calls.append(("Load", session_api_calls(stats_url, session) - before))
+
+    for _ in range(num_actions):
+        action = rng.choice(ACTIONS)
+        before = session_api_calls(stats_url, session)
+        had_error = False
+
+        if action == "Next":
+            button = find_button(at, label="Next →")
+            if button is None:
+                skipped[action] += 1
+                continue
+            button.click()
+            had_error = timed_run(action)
+        elif action == "Pass":
+            button = find_button(at, label="🗑️ Pass")
+            if button is None:
+                skipped[action] += 1
+                continue
+            button.click()
+            had_error = timed_run(action)
+        else:
+            # Track takes two reruns: open the dropdown, then pick a user
+            button = find_button(at, key="track_button")
+            if button is None:
+                skipped[action] += 1
+                continue
+            if not at.session_state["show_track_dropdown"]:
+                button.click()
+                had_error = timed_run(action)
+            user_button = find_button(at, key=f"assign_{rng.choice(users)}")
+            if user_button is None:
+                # The dropdown rerun already ran, so keep its API calls with it
+                skipped[action] += 1
+                calls.append((action, session_api_calls(stats_url, session) - before))
+                continue
+            user_button.click()
+            had_error = timed_run(action) or had_error
+
+        if had_error:
+            failed[action] += 1
+        calls.append((action, session_api_calls(stats_url, session) - before))
+
+    return {
+        "session": session,
+        "reruns": reruns,
+        "calls": calls,
+        "skipped": dict(skipped),
+        "failed": dict(failed),
+        "exceptions": exceptions,
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# Nearest-rank percentile of a list of numbers
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def print_report(results, server_stats, wall_time):
+    rerun_times = defaultdict(list)
+    action_calls = defaultdict(list)
+    skipped = Counter()
+    failed = Counter()
+    exceptions = 0
+    baselines = []
+    growths = []
+
+    for result in results:
+        for action, seconds in result["reruns"]:
+            rerun_times[action].append(seconds)
+            rerun_times["ALL"].append(seconds)
+        for action, count in result["calls"]:
+            action_calls[action].append(count)
+        skipped.update(result["skipped"])
+        failed.update(result["failed"])
+        exceptions += result["exceptions"]
+        if result["peak_rss_mb"] is not None:
+            baselines.append(result["baseline_rss_mb"])
+            growths.append(result["peak_rss_mb"] - result["baseline_rss_mb"])
+
+    print(f"\nIsolated sessions: {len(results)} (one process each, no shared st.cache_data)   Wall time: {wall_time:.1f}s")
+    print("\nRerun latency (ms)")
+    print(f"{'Action':<8}{'Reruns':>8}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for action in ["Load"] + ACTIONS + ["ALL"]:
+        times = rerun_times.get(action, [])
+        print(f"{action:<8}{len(times):>8}{format_ms(percentile(times, 50)):>8}"
+              f"{format_ms(percentile(times, 95)):>8}{format_ms(percentile(times, 99)):>8}")
+
+    print("\nAPI calls per action (Load is a cold cache in every session)")
+    print(f"{'Action':<8}{'Count':>8}{'Mean':>8}{'Max':>8}{'Errors':>8}")
+    for action in ["Load"] + ACTIONS:
+        counts = action_calls.get(action, [])
+        mean = f"{sum(counts) / len(counts):.1f}" if counts else "-"
+        maximum = max(counts) if counts else "-"
+        print(f"{action:<8}{len(counts):>8}{mean:>8}{maximum:>8}{failed.get(action, 0):>8}")
+    print("Errors = actions where a rerun showed st.error")
+
+    print("\nAPI calls by route")
+    print(f"  {'Route':<24}{'Calls':>8}{'429':>8}{'500':>8}")
+    total_429 = total_500 = 0
+    for route, count in sorted(server_stats["by_route"].items()):
+        statuses = server_stats["by_status"].get(route, {})
+        total_429 += statuses.get("429", 0)
+        total_500 += statuses.get("500", 0)
+        print(f"  {route:<24}{count:>8}{statuses.get('429', 0):>8}{statuses.get('500', 0):>8}")
+    print(f"  {'TOTAL':<24}{server_stats['total']:>8}{total_429:>8}{total_500:>8}")
+
+    if growths:
+        print(f"\nPeak RSS growth above the post-import baseline per session: "
+              f"max {max(growths):.0f} MB, mean {sum(growths) / len(growths):.0f} MB "
+              f"(baseline {sum(baselines) / len(baselines):.0f} MB)")
+    if skipped:
+        print(f"Skipped actions (button not rendered): {dict(skipped)}")
+    print(f"Script exceptions: {exceptions}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test app.py against a mock Affinity server")
+    parser.add_argument("--sessions", type=int, default=4, help="Number of isolated sessions run at the same time")
+    parser.add_argument("--actions", type=int, default=10, help="Actions per session after the initial load")
+    parser.add_argument("--entries", type=int, default=50, help="Number of list entries on the mock server")
+    parser.add_argument("--max-entries", type=int, default=100, help="Most recent entries app.py enriches on load (max_entries secret)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed latency added to every API request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency up to this value")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of API requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API requests answered with 500")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-rerun AppTest timeout, and how long sessions wait for each other to start, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = mock_affinity.start_server(
+        num_entries=args.entries,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"Mock Affinity server on {server.base_url}")
+
+    try:
+        with Manager() as manager, ProcessPoolExecutor(max_workers=args.sessions) as pool:
+            barrier = manager.Barrier(args.sessions)
+            start = time.perf_counter()
+            futures = [
+                pool.submit(run_session, i, server.base_url, args.actions, args.max_entries, args.timeout, args.seed, barrier)
+                for i in range(args.sessions)
+            ]
+            results = []
+            failures = []
+            for i, future in enumerate(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    failures.append(f"s{i}: {type(e).__name__}: {e}")
+            wall_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if results:
+        print_report(results, server.get_stats(), wall_time)
+    if failures:
+        print(f"\n{len(failures)} of {args.sessions} sessions failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
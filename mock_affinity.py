@@ -0,0 +1,343 @@
+"""Local mock of the Affinity API endpoints used by app.py.
+
+Serves list entries, field values, organizations and list-entry POSTs from
+generated in-memory data, and can inject latency, 429s and server errors.
+List entries are paged with page_size/page_token like the real API.
+
+Requests may be prefixed with a session tag (e.g. /s3/lists/1/list-entries)
+so API calls can be counted per simulated session. Counts by route and
+response status (including injected 429s and 500s) are exposed at
+GET /_stats?session=s3.
+
+Run standalone with:
+    python mock_affinity.py --port 8765 --entries 50 --latency-ms 100
+"""
+import argparse
+import datetime
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# IDs used by the mock data - load_test.py builds app secrets from these
+LIST_ID = 1001
+MASTER_DEALFLOW_LIST_ID = 1002
+FIELD_IDS = {
+    "transition_owner": 2001,
+    "reviewed": 2002,
+    "master_dealflow": 2003,
+    "category": 2004,
+    "investors": 2005,
+    "summary": 2006,
+    "country": 2007,
+    "user_profile": 2008,
+}
+NAME_TO_PERSON_ID = {
+    "Alice": "3001",
+    "Bob": "3002",
+    "Carol": "3003",
+    "Pass": "3999",
+}
+USER_PROFILES = ["Founder", "Operator", "Academic"]
+CATEGORIES = ["All", "SaaS", "Fintech", "Health", "Climate"]
+COUNTRIES = ["UK", "US", "DE", "FR", "SE"]
+
+SESSION_PREFIX = re.compile(r"^/(s\d+)(/.*)$")
+
+
+# Generate deterministic list entries, organizations and field values
+def build_dataset(num_entries, seed=0):
+    rng = random.Random(seed)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    entries = []
+    field_values = {}
+    next_field_value_id = 500000
+
+    for i in range(num_entries):
+        entity_id = 100000 + i
+        created_at = now - datetime.timedelta(days=rng.randint(0, 120))
+        entries.append({
+            "id": 900000 + i,
+            "list_id": LIST_ID,
+            "entity_id": entity_id,
+            "created_at": created_at.isoformat().replace("+00:00", "Z"),
+            "entity": {
+                "id": entity_id,
+                "name": f"Company {i}",
+                "domain": f"company{i}.example.com",
+            },
+        })
+
+        values = [
+            (FIELD_IDS["user_profile"], rng.choice(USER_PROFILES)),
+            (FIELD_IDS["category"], rng.choice(CATEGORIES[1:])),
+            (FIELD_IDS["investors"], f"Fund {rng.randint(1, 20)}"),
+            (FIELD_IDS["country"], rng.choice(COUNTRIES)),
+            (FIELD_IDS["summary"], f"Summary for Company {i}. " * rng.randint(1, 5)),
+        ]
+        field_values[entity_id] = []
+        for field_id, value in values:
+            field_values[entity_id].append({
+                "id": next_field_value_id,
+                "field_id": field_id,
+                "entity_id": entity_id,
+                "list_entry_id": 900000 + i,
+                "value": value,
+            })
+            next_field_value_id += 1
+
+    return {
+        "entries": entries,
+        "field_values": field_values,
+        "master_entries": {},
+        "next_id": next_field_value_id,
+    }
+
+
+class MockAffinityHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep the load test output readable
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _handle(self, method):
+        server = self.server
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = parse_qs(parsed.query)
+
+        # Stats endpoint is never delayed, failed or counted
+        if method == "GET" and path == "/_stats":
+            session = query.get("session", [None])[0]
+            self._send_json(200, server.get_stats(session))
+            return
+
+        # Strip the optional session prefix used for per-session counting
+        session = None
+        match = SESSION_PREFIX.match(path)
+        if match:
+            session, path = match.group(1), match.group(2)
+
+        route = self._route_name(method, path)
+        body = self._read_json() if method in ("POST", "PUT") else {}
+
+        # Injected latency
+        delay = server.latency_ms + server.rng_uniform(0, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        # Injected failures
+        roll = server.rng_uniform(0, 1)
+        if roll < server.rate_limit_rate:
+            server.record_call(session, route, 429)
+            self._send_json(429, {"message": "Too many requests"}, {"Retry-After": "1"})
+            return
+        if roll < server.rate_limit_rate + server.error_rate:
+            server.record_call(session, route, 500)
+            self._send_json(500, {"message": "Internal server error"})
+            return
+
+        status, response = self._dispatch(method, path, query, body)
+        server.record_call(session, route, status)
+        self._send_json(status, response)
+
+    def _route_name(self, method, path):
+        if re.fullmatch(r"/lists/\d+/list-entries", path):
+            return f"{method} list-entries"
+        if path.startswith("/field-values"):
+            return f"{method} field-values"
+        if path.startswith("/organizations/"):
+            return f"{method} organizations"
+        return f"{method} other"
+
+    def _dispatch(self, method, path, query, body):
+        data = self.server.data
+        lock = self.server.data_lock
+
+        list_entries_match = re.fullmatch(r"/lists/(\d+)/list-entries", path)
+        if list_entries_match:
+            list_id = int(list_entries_match.group(1))
+            if method == "GET":
+                # Without page_size the real API returns a plain list of every entry
+                if "page_size" not in query:
+                    return 200, data["entries"]
+                # The page token is simply the offset of the next page
+                page_size = int(query["page_size"][0])
+                offset = int(query.get("page_token", ["0"])[0])
+                next_offset = offset + page_size
+                next_page_token = str(next_offset) if next_offset < len(data["entries"]) else None
+                return 200, {"list_entries": data["entries"][offset:next_offset], "next_page_token": next_page_token}
+            if method == "POST":
+                with lock:
+                    entry_id = data["next_id"]
+                    data["next_id"] += 1
+                    entity_id = body.get("entity_id")
+                    data["master_entries"][entity_id] = entry_id
+                return 200, {"id": entry_id, "list_id": list_id, "entity_id": entity_id}
+
+        if path == "/field-values":
+            if method == "GET":
+                entity_id = int(query.get("organization_id", [0])[0])
+                with lock:
+                    return 200, list(data["field_values"].get(entity_id, []))
+            if method == "POST":
+                with lock:
+                    field_value = {
+                        "id": data["next_id"],
+                        "field_id": body.get("field_id"),
+                        "entity_id": body.get("entity_id"),
+                        "list_entry_id": body.get("list_entry_id"),
+                        "value": body.get("value"),
+                    }
+                    data["next_id"] += 1
+                    data["field_values"].setdefault(field_value["entity_id"], []).append(field_value)
+                return 200, field_value
+
+        field_value_match = re.fullmatch(r"/field-values/(\d+)", path)
+        if field_value_match and method == "PUT":
+            field_value_id = int(field_value_match.group(1))
+            with lock:
+                for values in data["field_values"].values():
+                    for field_value in values:
+                        if field_value["id"] == field_value_id:
+                            field_value["value"] = body.get("value")
+                            return 200, field_value
+            return 404, {"message": "Field value not found"}
+
+        organization_match = re.fullmatch(r"/organizations/(\d+)", path)
+        if organization_match and method == "GET":
+            entity_id = int(organization_match.group(1))
+            list_entries = [{"list_id": LIST_ID, "entity_id": entity_id}]
+            with lock:
+                if entity_id in data["master_entries"]:
+                    list_entries.append({
+                        "id": data["master_entries"][entity_id],
+                        "list_id": MASTER_DEALFLOW_LIST_ID,
+                        "entity_id": entity_id,
+                    })
+            return 200, {"id": entity_id, "name": f"Organization {entity_id}", "list_entries": list_entries}
+
+        return 404, {"message": f"No mock route for {method} {path}"}
+
+
+class MockAffinityServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, num_entries=50, latency_ms=0, jitter_ms=0,
+                 rate_limit_rate=0.0, error_rate=0.0, seed=0):
+        super().__init__(address, MockAffinityHandler)
+        self.data = build_dataset(num_entries, seed)
+        self.data_lock = threading.Lock()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._calls = Counter()
+        self._calls_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rng_uniform(self, low, high):
+        with self._rng_lock:
+            return self._rng.uniform(low, high)
+
+    def record_call(self, session, route, status):
+        with self._calls_lock:
+            self._calls[(session, route, status)] += 1
+
+    # Return call counts by route and by response status within each route,
+    # for one session or across all sessions
+    def get_stats(self, session=None):
+        by_route = Counter()
+        by_status = {}
+        with self._calls_lock:
+            for (call_session, route, status), count in self._calls.items():
+                if session is None or call_session == session:
+                    by_route[route] += count
+                    statuses = by_status.setdefault(route, Counter())
+                    statuses[str(status)] += count
+        return {
+            "total": sum(by_route.values()),
+            "by_route": dict(by_route),
+            "by_status": {route: dict(statuses) for route, statuses in by_status.items()},
+        }
+
+
+# Start a mock server on a background thread and return it
+def start_server(host="127.0.0.1", port=0, **options):
+    server = MockAffinityServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Affinity API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--entries", type=int, default=50, help="Number of list entries to generate")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency up to this value")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockAffinityServer(
+        (args.host, args.port),
+        num_entries=args.entries,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"Mock Affinity server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()